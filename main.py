@@ -4,15 +4,22 @@ Main application file with API endpoints
 """
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import BinaryIO, Callable, List, Optional, Sequence
+import asyncio
+import io
 import os
-import shutil
+import sys
+import aiofiles
 from pydantic import BaseModel
 
+from utils.index import ResumeIndex, index_tokens
 from utils.parser import ResumeParser
 
 
@@ -20,7 +27,8 @@ from utils.parser import ResumeParser
 app = FastAPI(
     title="Resume Filtering System",
     description="A web-based resume filtering application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Mount static files
@@ -31,11 +39,32 @@ templates = Jinja2Templates(directory="templates")
 
 # Constants
 UPLOAD_DIR = "/tmp/uploads"  # Use /tmp for Vercel serverless compatibility
-ALLOWED_EXTENSIONS = {".pdf", ".docx"}
+ALLOWED_EXTENSIONS = (".pdf", ".docx")  # tuple so str.endswith can check them in one call
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+INDEX_PATH = os.path.join(UPLOAD_DIR, ".index.json")
+
+# Uvicorn worker processes (uvicorn reads WEB_CONCURRENCY for --workers)
+SERVER_WORKERS = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+
+# Parser processes per server worker; defaults to an even share of the CPUs
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // SERVER_WORKERS)
 
 # Ensure upload directory exists
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Worker processes for resume parsing, created on first use
+PROC_POOL: Optional[ProcessPoolExecutor] = None
+
+# Set when processes cannot be started here (e.g. no /dev/shm on Vercel)
+PROC_POOL_UNAVAILABLE = False
+
+# Inverted index of resume tokens, loaded on first use
+RESUME_INDEX: Optional[ResumeIndex] = None
+
+# Serializes index updates with its saves, which run in a thread; created on
+# first use so it belongs to the running event loop
+RESUME_INDEX_LOCK: Optional[asyncio.Lock] = None
+
 
 # Pydantic models
 class FilterRequest(BaseModel):
@@ -49,22 +78,234 @@ class ResumeMatch(BaseModel):
 
 
 # Helper functions
+@lru_cache(maxsize=4096)
 def is_allowed_file(filename: str) -> bool:
     """Check if file extension is allowed"""
-    _, ext = os.path.splitext(filename)
-    return ext.lower() in ALLOWED_EXTENSIONS
+    name = filename.lower()
+    # Like os.path.splitext, leading dots belong to the name, so ".pdf" has no extension
+    return name.endswith(ALLOWED_EXTENSIONS) and "." in name.lstrip(".")
 
 
-def get_uploaded_resumes() -> List[str]:
-    """Get list of all uploaded resume files"""
+def scan_uploaded_resumes() -> List[os.DirEntry]:
+    """Get directory entries for all uploaded resume files"""
     if not os.path.exists(UPLOAD_DIR):
         return []
     
-    files = []
-    for filename in os.listdir(UPLOAD_DIR):
-        if is_allowed_file(filename):
-            files.append(filename)
-    return files
+    with os.scandir(UPLOAD_DIR) as entries:
+        return [entry for entry in entries if entry.is_file() and is_allowed_file(entry.name)]
+
+
+def get_uploaded_resumes() -> List[str]:
+    """Get list of all uploaded resume files"""
+    return [entry.name for entry in scan_uploaded_resumes()]
+
+
+def is_disk_backed(source: BinaryIO) -> bool:
+    """Check if an upload's temporary file lives on disk and can be sent with os.sendfile"""
+    # Only Linux can sendfile into a regular file; macOS and FreeBSD need a socket
+    if not sys.platform.startswith("linux") or not hasattr(os, "sendfile"):
+        return False
+    
+    # SpooledTemporaryFile.fileno() would force an in-memory file to disk
+    if getattr(source, "_rolled", True) is False:
+        return False
+    
+    try:
+        source.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+    return True
+
+
+def save_with_sendfile(source: BinaryIO, file_path: str) -> None:
+    """Copy a disk-backed upload to file_path inside the kernel with os.sendfile"""
+    source.flush()
+    source_fd = source.fileno()
+    size = os.fstat(source_fd).st_size
+    
+    with open(file_path, "wb") as buffer:
+        offset = 0
+        while offset < size:
+            try:
+                sent = os.sendfile(buffer.fileno(), source_fd, offset, size - offset)
+            except OSError:
+                if offset:
+                    raise
+                # sendfile is not supported for these files; copy in chunks instead
+                source.seek(0)
+                while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                    buffer.write(chunk)
+                return
+            if sent == 0:
+                break
+            offset += sent
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the shared process pool used for parsing resumes, or None to use threads"""
+    global PROC_POOL, PROC_POOL_UNAVAILABLE
+    if PROC_POOL is None and not PROC_POOL_UNAVAILABLE:
+        try:
+            PROC_POOL = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        except (OSError, ImportError, NotImplementedError) as e:
+            print(f"Process pool unavailable, parsing in threads instead: {e}")
+            PROC_POOL_UNAVAILABLE = True
+    return PROC_POOL
+
+
+def discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next call to get_process_pool builds a new one"""
+    global PROC_POOL
+    if PROC_POOL is pool:
+        PROC_POOL = None
+    pool.shutdown(wait=False)
+
+
+async def _run_batch(func: Callable, calls: Sequence[tuple]) -> list:
+    """Run calls in the process pool; calls lost to a broken pool return BrokenProcessPool"""
+    global PROC_POOL_UNAVAILABLE
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    
+    futures = []
+    try:
+        for args in calls:
+            futures.append(loop.run_in_executor(pool, func, *args))
+    except BrokenProcessPool as e:
+        # The remaining calls were never submitted
+        discard_process_pool(pool)
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return results + [e] * (len(calls) - len(futures))
+    except OSError as e:
+        if pool is None:
+            raise
+        # Worker processes could not be spawned
+        print(f"Process pool unavailable, parsing in threads instead: {e}")
+        for future in futures:
+            future.cancel()
+        discard_process_pool(pool)
+        PROC_POOL_UNAVAILABLE = True
+        return await asyncio.gather(*(loop.run_in_executor(None, func, *args) for args in calls))
+    
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BrokenProcessPool):
+            discard_process_pool(pool)
+        elif isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def run_in_workers(func: Callable, calls: Sequence[tuple]) -> list:
+    """
+    Run func once per argument tuple in parallel, preferably in the process pool
+    
+    A pool whose worker died is replaced and the calls it lost are retried
+    once together. Calls that break the pool again are run one at a time,
+    and any call that still kills its worker (e.g. on a malformed PDF)
+    gives None. Where processes cannot be started, the default thread
+    pool is used instead.
+    
+    Args:
+        func: Module-level function to call; the first argument is a file path
+        calls: Positional arguments for each call
+        
+    Returns:
+        Results in the order of calls
+    """
+    results = await _run_batch(func, calls)
+    
+    for attempt in range(2):
+        failed = [i for i, result in enumerate(results) if isinstance(result, BrokenProcessPool)]
+        if not failed:
+            break
+        
+        if attempt == 0:
+            retried = await _run_batch(func, [calls[i] for i in failed])
+        else:
+            retried = []
+            for i in failed:
+                result = (await _run_batch(func, [calls[i]]))[0]
+                if isinstance(result, BrokenProcessPool):
+                    print(f"Worker crashed in {func.__name__} on {calls[i][0]}; skipping it")
+                    result = None
+                retried.append(result)
+        
+        for i, result in zip(failed, retried):
+            results[i] = result
+    
+    return results
+
+
+def get_index_lock() -> asyncio.Lock:
+    """Get the lock guarding updates and saves of the resume index"""
+    global RESUME_INDEX_LOCK
+    if RESUME_INDEX_LOCK is None:
+        RESUME_INDEX_LOCK = asyncio.Lock()
+    return RESUME_INDEX_LOCK
+
+
+async def get_resume_index() -> ResumeIndex:
+    """Get the shared resume index, loading it from disk if needed"""
+    global RESUME_INDEX
+    if RESUME_INDEX is None:
+        async with get_index_lock():
+            if RESUME_INDEX is None:
+                index = ResumeIndex(INDEX_PATH)
+                await asyncio.to_thread(index.load)
+                RESUME_INDEX = index
+    return RESUME_INDEX
+
+
+async def refresh_index(filenames: List[str]) -> ResumeIndex:
+    """Index resumes that are new or changed since they were last indexed"""
+    index = await get_resume_index()
+    
+    stale = []
+    for filename in filenames:
+        try:
+            stat = os.stat(os.path.join(UPLOAD_DIR, filename))
+        except OSError:
+            continue
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if not index.is_current(filename, stat_key):
+            stale.append((filename, stat_key))
+    
+    if not stale:
+        return index
+    
+    token_sets = await run_in_workers(
+        index_tokens, [(os.path.join(UPLOAD_DIR, filename),) for filename, _ in stale]
+    )
+    
+    # Files that fail to parse are indexed without tokens so they are not retried
+    async with get_index_lock():
+        for (filename, stat_key), tokens in zip(stale, token_sets):
+            index.add(filename, stat_key, tokens or set())
+        await asyncio.to_thread(index.save)
+    return index
+
+
+def match_resume(filename: str, mask: int, keywords: List[str]) -> Optional[dict]:
+    """Build the response entry for a resume, or None if nothing matched"""
+    # Only include resumes with at least one match
+    if not mask:
+        return None
+    
+    return {
+        "filename": filename,
+        "matched_keywords": ResumeParser.matched_keywords(mask, keywords),
+        "score": ResumeParser.score_mask(mask)
+    }
+
+
+@app.on_event("shutdown")
+def shutdown_process_pool():
+    """Stop the parsing worker processes"""
+    global PROC_POOL
+    if PROC_POOL is not None:
+        PROC_POOL.shutdown()
+        PROC_POOL = None
 
 
 # API Endpoints
@@ -101,8 +342,12 @@ async def upload_resumes(files: List[UploadFile] = File(...)):
         # Save file
         file_path = os.path.join(UPLOAD_DIR, file.filename)
         try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            if is_disk_backed(file.file):
+                await asyncio.to_thread(save_with_sendfile, file.file, file_path)
+            else:
+                async with aiofiles.open(file_path, "wb") as buffer:
+                    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                        await buffer.write(chunk)
             uploaded_files.append(file.filename)
         except Exception as e:
             raise HTTPException(
@@ -110,11 +355,18 @@ async def upload_resumes(files: List[UploadFile] = File(...)):
                 detail=f"Failed to save file {file.filename}: {str(e)}"
             )
     
-    return JSONResponse({
+    # Parse uploads once now so /filter can answer from the index; the files
+    # are already saved, so a failure here is left for /filter to retry
+    try:
+        await refresh_index(uploaded_files)
+    except Exception as e:
+        print(f"Error indexing uploaded resumes: {e}")
+    
+    return {
         "message": "Resumes uploaded successfully",
         "files": uploaded_files,
         "count": len(uploaded_files)
-    })
+    }
 
 
 @app.post("/filter", response_model=dict)
@@ -131,7 +383,7 @@ async def filter_resumes(filter_request: FilterRequest):
     if not filter_request.keywords:
         raise HTTPException(status_code=400, detail="No keywords provided")
     
-    resumes = get_uploaded_resumes()
+    resumes = scan_uploaded_resumes()
     
     if not resumes:
         return {
@@ -140,25 +392,27 @@ async def filter_resumes(filter_request: FilterRequest):
             "total_resumes": 0
         }
     
-    matched_resumes = []
+    # Build the keyword automaton once and share it across all resumes
+    automaton = ResumeParser.build_automaton(filter_request.keywords)
     
-    for filename in resumes:
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        
-        # Extract text from resume
-        text = ResumeParser.extract_text(file_path)
-        
-        if text:
-            # Search for keywords
-            result = ResumeParser.search_keywords(text, filter_request.keywords)
-            
-            # Only include resumes with at least one match
-            if result["score"] > 0:
-                matched_resumes.append({
-                    "filename": filename,
-                    "matched_keywords": result["matched_keywords"],
-                    "score": result["score"]
-                })
+    if all(ResumeIndex.is_token(keyword) for keyword in filter_request.keywords if keyword):
+        # Every keyword lies within a single token, so the index gives the same matches
+        filenames = [entry.name for entry in resumes]
+        index = await refresh_index(filenames)
+        found = index.search(automaton, filenames)
+        masks = [found[filename] for filename in filenames]
+    else:
+        # Parse and search resumes in parallel worker processes
+        full_mask = ResumeParser.full_mask(automaton)
+        masks = await run_in_workers(
+            ResumeParser.match_file, [(entry.path, automaton, full_mask) for entry in resumes]
+        )
+    
+    matched_resumes = []
+    for entry, mask in zip(resumes, masks):
+        match = match_resume(entry.name, mask, filter_request.keywords)
+        if match is not None:
+            matched_resumes.append(match)
     
     # Sort by score (highest first)
     matched_resumes.sort(key=lambda x: x["score"], reverse=True)
@@ -205,6 +459,10 @@ async def delete_resume(filename: str):
     
     try:
         os.remove(file_path)
+        index = await get_resume_index()
+        async with get_index_lock():
+            index.remove(filename)
+            await asyncio.to_thread(index.save)
         return {"message": f"Resume {filename} deleted successfully"}
     except Exception as e:
         raise HTTPException(
@@ -225,4 +483,23 @@ async def health_check():
 # Run the application
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    
+    # Worker processes inherit this, so the parser pools are sized to match
+    os.environ.setdefault("WEB_CONCURRENCY", "4")
+    
+    # uvloop is not available on Windows
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "auto"
+    
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop=loop,
+        http="httptools",
+        workers=int(os.environ["WEB_CONCURRENCY"]),
+        reload=False
+    )
@@ -0,0 +1,104 @@
+"""
+Tests for the inverted resume index
+"""
+
+import random
+
+from utils.index import ResumeIndex
+from utils.parser import EXTRACTOR_VERSION, ResumeParser
+
+
+ALPHABET = "abcXYZ019_+#- .,\n/é"
+
+
+def index_of(texts: dict) -> ResumeIndex:
+    """Build an in-memory index over {filename: text}"""
+    index = ResumeIndex("/nonexistent/.index.json")
+    for filename, text in texts.items():
+        index.add(filename, (0, len(text)), ResumeIndex.tokenize(text))
+    return index
+
+
+def test_is_token():
+    assert ResumeIndex.is_token("Python")
+    assert ResumeIndex.is_token("c++")
+    assert ResumeIndex.is_token("c#")
+    assert not ResumeIndex.is_token("machine learning")
+    assert not ResumeIndex.is_token("node.js")
+    assert not ResumeIndex.is_token("josé")
+
+
+def test_search_matches_substrings_within_tokens():
+    texts = {"a.pdf": "Senior JavaScript developer", "b.pdf": "C++ and C# engineer"}
+    keywords = ["java", "Script", "c++", "c#", "dev", "ruby"]
+    automaton = ResumeParser.build_automaton(keywords)
+
+    masks = index_of(texts).search(automaton, texts)
+
+    assert ResumeParser.matched_keywords(masks["a.pdf"], keywords) == ["java", "Script", "dev"]
+    assert ResumeParser.matched_keywords(masks["b.pdf"], keywords) == ["c++", "c#"]
+
+
+def test_search_agrees_with_full_text_scan():
+    rng = random.Random(1234)
+    for _ in range(500):
+        texts = {
+            f"r{i}.pdf": "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+            for i in range(rng.randint(1, 4))
+        }
+        keywords = [
+            "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 3)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        keywords = [keyword for keyword in keywords if ResumeIndex.is_token(keyword)]
+        if not keywords:
+            continue
+        automaton = ResumeParser.build_automaton(keywords)
+
+        masks = index_of(texts).search(automaton, texts)
+
+        for filename, text in texts.items():
+            assert masks[filename] == ResumeParser.search_keywords(text, automaton), (text, keywords)
+
+
+def test_remove_drops_postings():
+    index = index_of({"a.pdf": "python", "b.pdf": "python go"})
+    index.remove("b.pdf")
+    automaton = ResumeParser.build_automaton(["go", "python"])
+
+    assert index.search(automaton, ["a.pdf", "b.pdf"]) == {"a.pdf": 2, "b.pdf": 0}
+
+
+def test_load_ignores_malformed_file(tmp_path):
+    path = tmp_path / ".index.json"
+    path.write_text('{"files": {"a.pdf": [1, 2]}}')
+
+    index = ResumeIndex(str(path))
+    index.load()
+
+    assert index.files == {}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / ".index.json")
+    index = index_of({"a.pdf": "python developer"})
+    index.path = path
+    index.save()
+
+    loaded = ResumeIndex(path)
+    loaded.load()
+
+    assert loaded.files == index.files
+    assert loaded.file_tokens == index.file_tokens
+
+
+def test_load_ignores_other_extractor_version(tmp_path):
+    path = tmp_path / ".index.json"
+    path.write_text(
+        f'{{"version": {EXTRACTOR_VERSION - 1}, "files": {{"a.pdf": [1, 2]}}, "tokens": {{"a.pdf": ["go"]}}}}'
+    )
+
+    index = ResumeIndex(str(path))
+    index.load()
+
+    assert index.files == {}
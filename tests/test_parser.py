@@ -0,0 +1,59 @@
+"""
+Tests for resume text extraction
+"""
+
+import hashlib
+import zipfile
+
+from utils.parser import CACHE_DIR_NAME, ResumeParser
+
+
+WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def write_docx(path, body: str, doctype: str = "") -> None:
+    """Write a minimal DOCX whose document.xml holds the given body"""
+    document = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"{doctype}"
+        f'<w:document xmlns:w="{WORD_NS}"><w:body>{body}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document)
+
+
+def test_docx_paragraphs_tabs_and_breaks(tmp_path):
+    path = tmp_path / "resume.docx"
+    write_docx(
+        path,
+        "<w:p><w:pPr><w:tabs><w:tab w:val=\"left\" w:pos=\"720\"/></w:tabs></w:pPr>"
+        "<w:r><w:t>Python</w:t><w:tab/><w:t>Go</w:t></w:r></w:p>"
+        "<w:p><w:r><w:t>Line</w:t><w:br/><w:t>Break</w:t></w:r></w:p>",
+    )
+
+    assert ResumeParser.extract_text_from_docx(str(path)) == "Python\tGo\nLine\nBreak"
+
+
+def test_docx_external_entities_are_not_resolved(tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("TOPSECRET")
+    path = tmp_path / "resume.docx"
+    write_docx(
+        path,
+        "<w:p><w:r><w:t>Name &xxe;</w:t></w:r></w:p>",
+        doctype=f'<!DOCTYPE w:document [<!ENTITY xxe SYSTEM "{secret.as_uri()}">]>',
+    )
+
+    assert ResumeParser.extract_text_from_docx(str(path)) == "Name"
+
+
+def test_unversioned_cache_entries_are_bypassed(tmp_path):
+    path = tmp_path / "resume.docx"
+    write_docx(path, "<w:p><w:r><w:t>Current text</w:t></w:r></w:p>")
+    key = hashlib.sha256(path.read_bytes()).hexdigest()
+    # Text persisted by an extractor from before cache versioning
+    (tmp_path / ".cache").mkdir()
+    (tmp_path / ".cache" / f"{key}.txt").write_text("Stale text")
+
+    assert ResumeParser.extract_text(str(path)) == "Current text"
+    assert (tmp_path / CACHE_DIR_NAME / f"{key}.txt").read_text() == "Current text"
@@ -2,6 +2,7 @@
 Utils package for Resume Filtering System
 """
 
+from .index import ResumeIndex
 from .parser import ResumeParser
 
-__all__ = ['ResumeParser']
+__all__ = ['ResumeIndex', 'ResumeParser']
@@ -0,0 +1,174 @@
+"""
+Resume Index Utility
+Inverted index of resume tokens so keyword filtering avoids rescanning files
+"""
+
+import bisect
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import ahocorasick
+
+from .parser import EXTRACTOR_VERSION, ResumeParser
+
+
+# Characters that make up a token; anything else separates tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9_+#-]+")
+
+
+def index_tokens(file_path: str) -> Optional[Set[str]]:
+    """
+    Extract the unique lowercase tokens of a resume file
+    
+    Module-level so it can run in worker processes.
+    
+    Args:
+        file_path: Path to the resume file
+        
+    Returns:
+        Set of tokens or None if extraction fails
+    """
+    text = ResumeParser.extract_text(file_path)
+    if text is None:
+        return None
+    return ResumeIndex.tokenize(text)
+
+
+class ResumeIndex:
+    """Maps tokens to the resumes containing them, persisted as JSON"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        # filename -> (mtime_ns, size) of the file when it was indexed
+        self.files: Dict[str, Tuple[int, int]] = {}
+        # filename -> tokens of the file, used to update postings on removal
+        self.file_tokens: Dict[str, Set[str]] = {}
+        # token -> filenames containing it
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self._vocabulary: Optional[Tuple[List[str], List[int], str]] = None
+    
+    @staticmethod
+    def tokenize(text: str) -> Set[str]:
+        """Split text into its unique lowercase tokens"""
+        return set(TOKEN_PATTERN.findall(text.lower()))
+    
+    @staticmethod
+    def is_token(keyword: str) -> bool:
+        """
+        Check if a keyword consists only of token characters
+        
+        Such a keyword occurs in a text exactly when it occurs inside one
+        of the text's tokens, so the index gives the same matches as
+        scanning the full text.
+        """
+        return TOKEN_PATTERN.fullmatch(keyword.lower()) is not None
+    
+    def load(self) -> None:
+        """Load the index from disk, starting empty if it is missing or unreadable"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as stored:
+                data = json.load(stored)
+            if data.get("version") != EXTRACTOR_VERSION:
+                # Tokens from an older extractor; files are re-indexed on demand
+                return
+            for filename, stat_key in data["files"].items():
+                mtime_ns, size = stat_key
+                tokens = data["tokens"][filename]
+                if not isinstance(tokens, list) or not all(isinstance(token, str) for token in tokens):
+                    raise TypeError(f"invalid tokens for {filename}")
+                self.add(str(filename), (int(mtime_ns), int(size)), set(tokens))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error loading resume index {self.path}: {e}")
+            self.files.clear()
+            self.file_tokens.clear()
+            self.postings.clear()
+            self._vocabulary = None
+    
+    def save(self) -> None:
+        """Persist the index atomically so other processes can load it"""
+        data = {
+            "version": EXTRACTOR_VERSION,
+            "files": {filename: list(stat_key) for filename, stat_key in self.files.items()},
+            "tokens": {filename: sorted(tokens) for filename, tokens in self.file_tokens.items()}
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as stored:
+                json.dump(data, stored)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving resume index {self.path}: {e}")
+    
+    def is_current(self, filename: str, stat_key: Tuple[int, int]) -> bool:
+        """Check if a file is indexed with the given (mtime_ns, size)"""
+        return self.files.get(filename) == stat_key
+    
+    def add(self, filename: str, stat_key: Tuple[int, int], tokens: Set[str]) -> None:
+        """Index a file's tokens, replacing any previous entry for it"""
+        self.remove(filename)
+        self.files[filename] = stat_key
+        self.file_tokens[filename] = tokens
+        for token in tokens:
+            self.postings[token].add(filename)
+        self._vocabulary = None
+    
+    def remove(self, filename: str) -> None:
+        """Drop a file from every posting list"""
+        tokens = self.file_tokens.pop(filename, None)
+        self.files.pop(filename, None)
+        if tokens is None:
+            return
+        
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(filename)
+            if not postings:
+                del self.postings[token]
+        self._vocabulary = None
+    
+    def search(self, automaton: ahocorasick.Automaton, filenames: Iterable[str]) -> Dict[str, int]:
+        """
+        Match keywords against the indexed tokens of the given files
+        
+        The vocabulary is searched in one automaton pass, and each matched
+        token's bits are applied to the files in its posting list.
+        
+        Args:
+            automaton: Automaton built with ResumeParser.build_automaton
+            filenames: Files to report on; others in the index are ignored
+            
+        Returns:
+            Bitmask of matched keyword positions for each filename
+        """
+        masks = dict.fromkeys(filenames, 0)
+        if len(automaton) == 0:
+            return masks
+        
+        tokens, starts, joined = self._get_vocabulary()
+        token_bits: Dict[int, int] = defaultdict(int)
+        for end, bit in automaton.iter(joined):
+            token_bits[bisect.bisect_right(starts, end) - 1] |= bit
+        
+        for position, bits in token_bits.items():
+            for filename in self.postings[tokens[position]]:
+                if filename in masks:
+                    masks[filename] |= bits
+        return masks
+    
+    def _get_vocabulary(self) -> Tuple[List[str], List[int], str]:
+        """Get all tokens, their start offsets, and the newline-joined vocabulary"""
+        if self._vocabulary is None:
+            tokens = list(self.postings)
+            starts = []
+            position = 0
+            for token in tokens:
+                starts.append(position)
+                position += len(token) + 1
+            self._vocabulary = (tokens, starts, "\n".join(tokens))
+        return self._vocabulary
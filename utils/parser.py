@@ -3,101 +3,378 @@ Resume Parser Utility
 Extracts text content from PDF and DOCX files
 """
 
+import hashlib
+import io
 import os
-from typing import Optional
-import PyPDF2
-from docx import Document
+import threading
+import zipfile
+from collections import OrderedDict
+from contextlib import closing
+from typing import BinaryIO, Callable, FrozenSet, Iterator, List, Optional, Tuple, Union
+import ahocorasick
+import pypdfium2 as pdfium
+from lxml import etree
+
+
+# WordprocessingML namespace and the document.xml tags that carry paragraph text
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_WORD_TEXT = _WORD_NS + "t"
+_WORD_PARAGRAPH = _WORD_NS + "p"
+_WORD_RUN = _WORD_NS + "r"
+_WORD_BREAKS = {_WORD_NS + "tab": "\t", _WORD_NS + "br": "\n", _WORD_NS + "cr": "\n"}
+
+# Maximum number of texts kept by each in-memory cache (least recently used go first)
+MAX_CACHE_ENTRIES = 512
+
+# Extracted text keyed by SHA-256 of the file bytes
+_TEXT_CACHE: "OrderedDict[str, str]" = OrderedDict()
+
+# Extracted text keyed by (path, mtime_ns, size), checked before hashing
+_PARSE_CACHE: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+
+# (path, mtime_ns, size, keyword words) of PDFs whose matching stopped early,
+# i.e. that are known to contain every word
+_EARLY_MATCH_CACHE: "OrderedDict[Tuple[Tuple[str, int, int], FrozenSet[str]], bool]" = OrderedDict()
+
+# Bumped whenever extraction output changes, so text persisted by an older
+# extractor is bypassed instead of served
+EXTRACTOR_VERSION = 2
+
+# Sub-directory (next to the resumes) holding persisted text, one file per hash
+CACHE_DIR_NAME = os.path.join(".cache", f"v{EXTRACTOR_VERSION}")
+
+# Guards the in-memory caches, which threads may share
+_CACHE_LOCK = threading.Lock()
+
+# PDFium is not thread-safe, so calls into it must be serialized
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _cache_get(cache: OrderedDict, key):
+    """Look up a cached value and mark it as recently used"""
+    with _CACHE_LOCK:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _cache_put(cache: OrderedDict, key, value) -> None:
+    """Store a value, evicting the least recently used entries past the limit"""
+    with _CACHE_LOCK:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > MAX_CACHE_ENTRIES:
+            cache.popitem(last=False)
 
 
 class ResumeParser:
     """Handles parsing of resume files in PDF and DOCX formats"""
     
     @staticmethod
-    def extract_text_from_pdf(file_path: str) -> Optional[str]:
+    def iter_pdf_pages(file_path: Union[str, BinaryIO]) -> Iterator[str]:
+        """
+        Yield the text of each page of a PDF file in order
+        
+        PDFium stays locked until the generator is exhausted or closed, so
+        callers that stop early should wrap it in contextlib.closing.
+        
+        Args:
+            file_path: Path to the PDF file or a binary file-like object
+            
+        Yields:
+            Text content of one page
+        """
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                for index in range(len(pdf)):
+                    page = pdf[index]
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range()
+                    textpage.close()
+                    page.close()
+                    yield text
+            finally:
+                pdf.close()
+    
+    @staticmethod
+    def extract_text_from_pdf(file_path: Union[str, BinaryIO]) -> Optional[str]:
         """
         Extract text content from a PDF file
         
         Args:
-            file_path: Path to the PDF file
+            file_path: Path to the PDF file or a binary file-like object
             
         Returns:
             Extracted text or None if extraction fails
         """
         try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text.strip()
+            return "\n".join(ResumeParser.iter_pdf_pages(file_path)).strip()
         except Exception as e:
             print(f"Error extracting text from PDF {file_path}: {e}")
             return None
     
     @staticmethod
-    def extract_text_from_docx(file_path: str) -> Optional[str]:
+    def extract_text_from_docx(file_path: Union[str, BinaryIO]) -> Optional[str]:
         """
         Extract text content from a DOCX file
         
+        word/document.xml is streamed with iterparse, one line per
+        paragraph, without building the python-docx object model.
+        
         Args:
-            file_path: Path to the DOCX file
+            file_path: Path to the DOCX file or a binary file-like object
             
         Returns:
             Extracted text or None if extraction fails
         """
         try:
-            doc = Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text.strip()
+            paragraphs = []
+            runs = []
+            tags = (_WORD_TEXT, _WORD_PARAGRAPH, *_WORD_BREAKS)
+            with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+                # Uploaded XML is untrusted: never expand entities or fetch
+                # external resources, which could pull local files into the text
+                parser = etree.iterparse(
+                    xml, events=("end",), tag=tags, resolve_entities=False, no_network=True
+                )
+                for _, element in parser:
+                    if element.tag == _WORD_TEXT:
+                        if element.text:
+                            runs.append(element.text)
+                    elif element.tag == _WORD_PARAGRAPH:
+                        paragraphs.append("".join(runs))
+                        runs = []
+                    elif element.getparent().tag == _WORD_RUN:
+                        # Only run content; <w:tab> also defines tab stops under <w:pPr>
+                        runs.append(_WORD_BREAKS[element.tag])
+                    element.clear()
+            return "\n".join(paragraphs).strip()
         except Exception as e:
             print(f"Error extracting text from DOCX {file_path}: {e}")
             return None
     
+    @staticmethod
+    def _load_cached_text(cache_path: str) -> Optional[str]:
+        """Read previously persisted text, or None if it is not on disk"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as cached:
+                return cached.read()
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _store_cached_text(cache_path: str, text: str) -> None:
+        """Persist extracted text so other processes can reuse it"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as cached:
+                cached.write(text)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Error writing text cache {cache_path}: {e}")
+    
+    @staticmethod
+    def _extract_by_content(file_path: str, extractor) -> Optional[str]:
+        """Extract text through the SHA-256 content caches"""
+        # A plain read, not mmap: another request may truncate the file while
+        # it is being read, which must give a short read rather than SIGBUS
+        try:
+            with open(file_path, 'rb') as file:
+                data = file.read()
+        except OSError as e:
+            print(f"Error reading resume {file_path}: {e}")
+            return None
+        
+        key = hashlib.sha256(data).hexdigest()
+        text = _cache_get(_TEXT_CACHE, key)
+        if text is not None:
+            return text
+        
+        cache_path = os.path.join(os.path.dirname(file_path), CACHE_DIR_NAME, f"{key}.txt")
+        text = ResumeParser._load_cached_text(cache_path)
+        if text is None:
+            text = extractor(io.BytesIO(data))
+            if text is None:
+                return None
+            ResumeParser._store_cached_text(cache_path, text)
+        
+        _cache_put(_TEXT_CACHE, key, text)
+        return text
+    
     @staticmethod
     def extract_text(file_path: str) -> Optional[str]:
         """
         Extract text from resume file (auto-detects format)
         
+        A file whose path, modification time and size are unchanged is
+        served from memory after a single stat. Otherwise results are
+        cached by the SHA-256 of the file contents, in memory and under a
+        versioned .cache directory next to the file, so unchanged resumes
+        are only parsed once per extractor version.
+        
         Args:
             file_path: Path to the resume file
             
         Returns:
             Extracted text or None if extraction fails
         """
+        return ResumeParser._extract_text(file_path, ResumeParser.extract_text_from_pdf)
+    
+    @staticmethod
+    def _extract_text(file_path: str, pdf_extractor: Callable[[BinaryIO], Optional[str]]) -> Optional[str]:
+        """Extract text through the caches, parsing PDFs with pdf_extractor"""
         _, extension = os.path.splitext(file_path)
         extension = extension.lower()
         
         if extension == '.pdf':
-            return ResumeParser.extract_text_from_pdf(file_path)
+            extractor = pdf_extractor
         elif extension == '.docx':
-            return ResumeParser.extract_text_from_docx(file_path)
+            extractor = ResumeParser.extract_text_from_docx
         else:
             print(f"Unsupported file format: {extension}")
             return None
+        
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            print(f"Error reading resume {file_path}: {e}")
+            return None
+        
+        stat_key = (file_path, stat.st_mtime_ns, stat.st_size)
+        text = _cache_get(_PARSE_CACHE, stat_key)
+        if text is not None:
+            return text
+        
+        text = ResumeParser._extract_by_content(file_path, extractor)
+        if text is not None:
+            _cache_put(_PARSE_CACHE, stat_key, text)
+        return text
     
     @staticmethod
-    def search_keywords(text: str, keywords: list) -> dict:
+    def match_file(file_path: str, automaton: ahocorasick.Automaton, full_mask: int) -> int:
         """
-        Search for keywords in text (case-insensitive)
+        Search a resume file for keywords, parsing only as much as needed
+        
+        Cached text is searched directly. An uncached PDF is matched page
+        by page and parsing stops once every keyword has been seen. Text
+        from an early stop is incomplete and is not cached; instead the
+        early stop itself is remembered for the unchanged file and the same
+        keywords, so repeating the search does not parse it again.
+        
+        Args:
+            file_path: Path to the resume file
+            automaton: Automaton built with build_automaton
+            full_mask: Mask with every keyword bit set (see full_mask)
+            
+        Returns:
+            Bitmask of matched keyword positions
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            print(f"Error reading resume {file_path}: {e}")
+            return 0
+        early_key = ((file_path, stat.st_mtime_ns, stat.st_size), frozenset(automaton.keys()))
+        if _cache_get(_EARLY_MATCH_CACHE, early_key):
+            return full_mask
+        
+        mask = 0
+        parsed_pages = False
+        stopped_early = False
+        
+        def parse_until_matched(source: BinaryIO) -> Optional[str]:
+            nonlocal mask, parsed_pages, stopped_early
+            parts = []
+            try:
+                with closing(ResumeParser.iter_pdf_pages(source)) as pages:
+                    for page_text in pages:
+                        parts.append(page_text)
+                        mask |= ResumeParser.search_keywords(page_text, automaton)
+                        if mask == full_mask:
+                            # Partial text must not be cached
+                            stopped_early = True
+                            return None
+            except Exception as e:
+                print(f"Error extracting text from PDF {file_path}: {e}")
+                mask = 0
+                return None
+            parsed_pages = True
+            return "\n".join(parts).strip()
+        
+        text = ResumeParser._extract_text(file_path, parse_until_matched)
+        if stopped_early:
+            _cache_put(_EARLY_MATCH_CACHE, early_key, True)
+        if text is None or parsed_pages:
+            # The pages were already matched as they were read
+            return mask
+        return ResumeParser.search_keywords(text, automaton)
+    
+    @staticmethod
+    def build_automaton(keywords: List[str]) -> ahocorasick.Automaton:
+        """
+        Build an Aho-Corasick automaton matching all keywords (case-insensitive)
         
         Args:
-            text: Text to search in
             keywords: List of keywords to search for
             
         Returns:
-            Dictionary with matched keywords and match count
+            Automaton whose values are keyword bits (1 << position in keywords)
         """
-        if not text:
-            return {"matched_keywords": [], "score": 0}
+        automaton = ahocorasick.Automaton()
+        for position, keyword in enumerate(keywords):
+            if keyword:
+                # Repeated keywords (in any casing) share a word, so keep every bit
+                word = keyword.lower()
+                automaton.add_word(word, automaton.get(word, 0) | 1 << position)
+        automaton.make_automaton()
+        return automaton
+    
+    @staticmethod
+    def search_keywords(text: str, automaton: ahocorasick.Automaton) -> int:
+        """
+        Search for keywords in text (case-insensitive)
         
-        text_lower = text.lower()
-        matched = []
+        Args:
+            text: Text to search in
+            automaton: Automaton built with build_automaton
+            
+        Returns:
+            Bitmask of matched keyword positions
+        """
+        mask = 0
+        if not text or len(automaton) == 0:
+            return mask
         
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                matched.append(keyword)
+        for _, bit in automaton.iter(text.lower()):
+            mask |= bit
+        return mask
+    
+    @staticmethod
+    def full_mask(automaton: ahocorasick.Automaton) -> int:
+        """Combine the bits of every keyword in the automaton"""
+        mask = 0
+        for bit in automaton.values():
+            mask |= bit
+        return mask
+    
+    @staticmethod
+    def score_mask(mask: int) -> int:
+        """Count the keywords matched in a bitmask"""
+        return bin(mask).count("1")
+    
+    @staticmethod
+    def matched_keywords(mask: int, keywords: List[str]) -> List[str]:
+        """
+        Expand a bitmask back into the keywords it represents
         
-        return {
-            "matched_keywords": matched,
-            "score": len(matched)
-        }
+        Args:
+            mask: Bitmask returned by search_keywords or match_file
+            keywords: Keywords the automaton was built from
+            
+        Returns:
+            Matched keywords in their original order and casing
+        """
+        return [keyword for position, keyword in enumerate(keywords) if mask >> position & 1]